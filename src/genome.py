@@ -6,7 +6,159 @@ from abc import (
     # A tag that says that this method must be implemented by a child class
     abstractmethod
 )
-from typing import Iterable
+from typing import Callable, Iterable, Sequence
+import random
+import numpy as np
+from numba import njit
+
+# Status codes for nucleotides, and the character each is shown as.
+_FREE, _ACTIVE, _DISABLED = 0, 1, 2
+_STATUS_CHARS = np.array([ord('-'), ord('A'), ord('x')], dtype=np.uint8)
+# The same mapping for rendering status codes with bytes.translate.
+_STATUS_TABLE = bytes.maketrans(bytes([_FREE, _ACTIVE, _DISABLED]), b'-Ax')
+
+
+@njit(cache=True)
+def _order(links: np.ndarray, n: int) -> np.ndarray:
+    """Get the first n indices visited following the links from 0."""
+    out = np.empty(n, dtype=np.int64)
+    i = 0
+    for k in range(n):
+        out[k] = i
+        i = links[i]
+    return out
+
+
+# Skip lists have this many levels above the links, and a link that
+# is on one level is also on the next with this probability.
+_SKIP_LEVELS = 16
+_SKIP_P = 0.25
+
+
+@njit(cache=True)
+def _skip_find(links: np.ndarray, tower: np.ndarray,
+               up_next: np.ndarray, up_span: np.ndarray,
+               t: int, update: np.ndarray, update_rank: np.ndarray) -> int:
+    """
+    Find the link at rank t in a skip list with head 0.
+
+    The skip pointers for level l of link x are at tower[x] + l in
+    up_next/up_span, where up_span is the number of links they move
+    forward. The last link at or before rank t on each level, and its
+    rank, is left in update and update_rank.
+    """
+    x, rx = 0, 0
+    for level in range(len(update) - 1, -1, -1):
+        e = tower[x] + level
+        while up_next[e] != 0 and rx + up_span[e] <= t:
+            rx += up_span[e]
+            x = up_next[e]
+            e = tower[x] + level
+        update[level] = x
+        update_rank[level] = rx
+    for _ in range(t - rx):
+        x = links[x]
+    return x
+
+
+@njit(cache=True)
+def _skip_insert(height: np.ndarray, tower: np.ndarray,
+                 up_next: np.ndarray, up_span: np.ndarray,
+                 update: np.ndarray, update_rank: np.ndarray,
+                 first: int, r: int, length: int) -> None:
+    """
+    Add new links to the skip levels.
+
+    The links first, first + 1, ..., first + length - 1 have just been
+    inserted at ranks r, r + 1, ... and update/update_rank hold the
+    result of _skip_find for rank r - 1.
+    """
+    for level in range(len(update)):
+        e = tower[update[level]] + level
+        rx = update_rank[level]
+        y = up_next[e]
+        ry = rx + up_span[e] + length  # where y is after the insertion
+        for k in range(length):
+            if height[first + k] > level:
+                up_next[e] = first + k
+                up_span[e] = r + k - rx
+                e = tower[first + k] + level
+                rx = r + k
+        up_next[e] = y
+        up_span[e] = ry - rx
+
+
+@njit(cache=True)
+def _skip_rank(links: np.ndarray, height: np.ndarray, tower: np.ndarray,
+               up_next: np.ndarray, up_span: np.ndarray,
+               n: int, x: int) -> int:
+    """Get the rank of link x in a skip list of n links with head 0."""
+    # Move along the highest level we can until we are back at the head,
+    # counting how far we went.
+    dist = 0
+    while x != 0:
+        if height[x] == 0:
+            dist += 1
+            x = links[x]
+        else:
+            e = tower[x] + height[x] - 1
+            dist += up_span[e]
+            x = up_next[e]
+    return n - dist if dist else 0
+
+
+def _grow(a: np.ndarray, size: int) -> np.ndarray:
+    """Get a with room for at least size elements, doubling as needed."""
+    cap = len(a)
+    if size <= cap:
+        return a
+    while cap < size:
+        cap *= 2
+    # Callers never look beyond what they use, so np.resize's filling
+    # is harmless.
+    return np.resize(a, cap)
+
+
+class _ActiveList(list[int]):
+    """
+    The IDs of the active TEs.
+
+    A list, so we can pick a random active TE without copying anything,
+    which also keeps track of where each ID is so removing one is O(1).
+    """
+
+    _index: dict[int, int]           # Map from IDs to their index
+
+    def __init__(self) -> None:
+        """Create an empty list."""
+        super().__init__()
+        self._index = {}
+
+    def add(self, te: int) -> None:
+        """Add te at the end of the list."""
+        self._index[te] = len(self)
+        self.append(te)
+
+    def discard(self, te: int) -> None:
+        """Remove te by moving the last ID into its place."""
+        i = self._index.pop(te)
+        last = self.pop()
+        if i < len(self):
+            self[i] = last
+            self._index[last] = i
+
+
+def _wrap(pos: int, n: int) -> int:
+    """Wrap pos around a circular genome of length n."""
+    # Offsets are usually shorter than the genome, and then a single
+    # add or subtract is enough; only fall back to modulo otherwise.
+    if pos < 0:
+        pos += n
+    elif pos >= n:
+        pos -= n
+    if not 0 <= pos < n:
+        pos %= n
+    return pos
 
 
 class Genome(ABC):
@@ -62,9 +214,26 @@ class Genome(ABC):
 
     @abstractmethod
     def active_tes(self) -> list[int]:
-        """Get the active TE IDs."""
+        """Get the active TE IDs (in no particular order)."""
         ...  # not implemented yet
 
+    def active_count(self) -> int:
+        """
+        Get the number of active TEs.
+
+        Implementations can override this to count without listing them.
+        """
+        return len(self.active_tes())
+
+    def random_active(self, choice: Callable[[Sequence[int]], int]
+                      = random.choice) -> int:
+        """
+        Pick an active TE using choice, e.g. random.choice.
+
+        Implementations can override this to pick without listing them.
+        """
+        return choice(self.active_tes())
+
     @abstractmethod
     def __len__(self) -> int:
         """Get the current length of the genome."""
@@ -90,18 +259,60 @@ class ListGenome(Genome):
     """
     Representation of a genome.
 
-    Implements the Genome interface using Python's built-in lists
+    Implements the Genome interface using a flat array with an entry
+    per nucleotide, kept as a gap buffer: the genome is nuc[:gap]
+    followed by nuc[gap_end:], and the unused gap in between sits where
+    we last inserted. Inserting only moves the nucleotides between the
+    old gap and the new insertion point, rather than the whole tail of
+    the genome.
     """
 
     next_te_id: int                  # For assigning IDs to TEs.
-    nuc: list[int]                   # The genome (as a linear list).
-    active: dict[int, int]           # map from active IDs to their length
+    nuc: np.ndarray                  # The genome (as a gap buffer).
+    status: bytearray                # Status code for each nucleotide
+    _gap: int                        # Start of the gap in nuc/status
+    _gap_end: int                    # End of the gap in nuc/status
+    _len: int                        # Number of nucleotides in the genome
+    # Map from active IDs to their pos and length
+    active: dict[int, tuple[int, int]]
+    _active_ids: _ActiveList         # The keys of active, as a list
 
     def __init__(self, n: int):
         """Create a new genome with length n."""
         self.next_te_id = 1
-        self.nuc = [0] * n
+        cap = max(n, 64)
+        self.nuc = np.zeros(cap, dtype=np.int32)
+        self.status = bytearray(cap)
+        self._gap, self._gap_end = n, cap
+        self._len = n
         self.active = {}
+        self._active_ids = _ActiveList()
+
+    def _index(self, pos: int) -> int:
+        """Get the index in nuc/status of position pos."""
+        return pos if pos < self._gap else pos + self._gap_end - self._gap
+
+    def _move_gap(self, pos: int, size: int) -> None:
+        """Move the gap to position pos and make room for size in it."""
+        gap, end = self._gap, self._gap_end
+        if end - gap < size:
+            cap = len(self.nuc)
+            while cap - self._len < size:
+                cap *= 2
+            new_end = cap - (len(self.nuc) - end)
+            nuc = np.zeros(cap, dtype=np.int32)
+            status = bytearray(cap)
+            for new, old in ((nuc, self.nuc), (status, self.status)):
+                new[:gap] = old[:gap]
+                new[new_end:] = old[end:]
+            self.nuc, self.status, end = nuc, status, new_end
+
+        for a in (self.nuc, self.status):
+            if pos < gap:
+                a[end - (gap - pos):end] = a[pos:gap]
+            elif pos > gap:
+                a[gap:pos] = a[end:end + (pos - gap)]
+        self._gap, self._gap_end = pos, end + (pos - gap)
 
     def insert_te(self, pos: int, length: int) -> int:
         """
@@ -116,14 +327,27 @@ class ListGenome(Genome):
         """
         # If we have collisions, destroy the existing TE that
         # is hit.
-        if self.nuc[pos] in self.active:
-            del self.active[self.nuc[pos]]
+        if pos < self._len and int(self.nuc[self._index(pos)]) in self.active:
+            self.disable_te(int(self.nuc[self._index(pos)]))
 
         # insert the TE
         te = self.next_te_id
         self.next_te_id += 1
-        self.active[te] = length
-        self.nuc[pos:pos] = [te] * length
+
+        # Active TEs are never split, since inserting into one disables
+        # it, so everything at or after pos just moves length up.
+        for other, (p, n) in self.active.items():
+            if p >= pos:
+                self.active[other] = (p + length, n)
+        self.active[te] = (pos, length)
+        self._active_ids.add(te)
+
+        # Move the gap to pos and fill the start of it with the TE.
+        self._move_gap(pos, length)
+        self.nuc[pos:pos + length] = te
+        self.status[pos:pos + length] = bytes([_ACTIVE]) * length
+        self._gap += length
+        self._len += length
 
         return te
 
@@ -141,12 +365,8 @@ class ListGenome(Genome):
         """
         if te not in self.active:
             return None
-        # Find the location of the TE. It is a lot of bookkeeping
-        # to keep track of positions in a changing genome, so we
-        # explicitly search for the bugger instead.
-        pos = self.nuc.index(te)
-        length = self.active[te]
-        return self.insert_te((pos + offset) % len(self.nuc), length)
+        pos, length = self.active[te]
+        return self.insert_te(_wrap(pos + offset, self._len), length)
 
     def disable_te(self, te: int) -> None:
         """
@@ -157,15 +377,29 @@ class ListGenome(Genome):
         for those.
         """
         if te in self.active:
-            del self.active[te]
+            # The gap is always at the end of the last inserted TE, so
+            # it never splits an active TE.
+            pos, length = self.active.pop(te)
+            self._active_ids.discard(te)
+            i = self._index(pos)
+            self.status[i:i + length] = bytes([_DISABLED]) * length
 
     def active_tes(self) -> list[int]:
         """Get the active TE IDs."""
-        return list(self.active)
+        return list(self._active_ids)
+
+    def random_active(self, choice: Callable[[Sequence[int]], int]
+                      = random.choice) -> int:
+        """Pick an active TE using choice, e.g. random.choice."""
+        return choice(self._active_ids)
+
+    def active_count(self) -> int:
+        """Get the number of active TEs."""
+        return len(self.active)
 
     def __len__(self) -> int:
         """Return length of genome."""
-        return len(self.nuc)
+        return self._len
 
     def __str__(self) -> str:
         """
@@ -178,76 +412,162 @@ class ListGenome(Genome):
         represented with the character '-', active TEs with 'A', and disabled
         TEs with 'x'.
         """
-        return ''.join(
-            '-' if a == 0 else
-            'A' if a in self.active else
-            'x'
-            for a in self.nuc
-        )
+        # Translate each side of the gap and join them.
+        return b''.join((
+            self.status[:self._gap].translate(_STATUS_TABLE),
+            self.status[self._gap_end:].translate(_STATUS_TABLE),
+        )).decode('ascii')
 
 
 class LinkedListGenome(Genome):
     """
     Representation of a genome.
 
-    Implements the Genome interface using linked lists.
+    Implements the Genome interface using linked lists. The links are
+    stored as parallel arrays, nuc/next/prev, indexed by link, with
+    spare capacity at the end for new links.
+
+    On top of the links we keep skip list levels, so we can find the
+    link at a position, or the position of a link, in expected
+    O(log n) instead of walking from the start of the genome. Link 0 is
+    always at position 0 and is the head of all the levels.
     """
 
     next_te_id: int                  # For assigning IDs to TEs.
-    nuc: list[int]                   # Content of the genome
-    next: list[int]                  # Next pointers
-    prev: list[int]                  # Prev pointers
+    nuc: np.ndarray                  # Content of the genome
+    _len: int                        # Number of links in use
+    next: np.ndarray                 # Next pointers
+    prev: np.ndarray                 # Prev pointers
+    height: np.ndarray               # Number of skip levels for each link
+    tower: np.ndarray                # Offset of each link's skip pointers
+    up_next: np.ndarray              # Skip pointers for all levels
+    up_span: np.ndarray              # Number of links skip pointers skip
+    _up_len: int                     # Number of skip pointers in use
+    _rng: np.random.Generator        # For drawing skip levels
+    _update: np.ndarray              # Search path from the last lookup
+    _update_rank: np.ndarray         # Positions along that path
     # Map from active IDs to their pos and length
     active: dict[int, tuple[int, int]]
+    _active_ids: _ActiveList         # The keys of active, as a list
+    active_mask: np.ndarray          # active[te] as a table indexed by te
 
     def __init__(self, n: int):
         """Create a new genome with length n."""
         self.next_te_id = 1
-        self.nuc = [0] * n
-        self.next = [(i + 1) % n for i in range(n)]
-        self.prev = [(i - 1) % n for i in range(n)]
+        cap = max(n, 64)
+        self.nuc = np.zeros(cap, dtype=np.int64)
+        self._len = n
+        self.next = np.zeros(cap, dtype=np.int64)
+        self.prev = np.zeros(cap, dtype=np.int64)
+        # Link the nucleotides in order and close the circle.
+        self.next[:n] = np.arange(1, n + 1)
+        self.prev[:n] = np.arange(-1, n - 1)
+        if n > 0:
+            self.next[n - 1] = 0
+            self.prev[0] = n - 1
         self.active = {}
+        self._active_ids = _ActiveList()
+        self.active_mask = np.zeros(64, dtype=bool)
+
+        # Build the skip levels. Initially, link k is at position k.
+        self._rng = np.random.default_rng(n)
+        self._update = np.zeros(_SKIP_LEVELS, dtype=np.int64)
+        self._update_rank = np.zeros(_SKIP_LEVELS, dtype=np.int64)
+        self.height = np.zeros(cap, dtype=np.int64)
+        self.height[0] = _SKIP_LEVELS
+        self.height[1:n] = self._new_heights(n - 1)
+        self.tower = np.zeros(cap, dtype=np.int64)
+        self.tower[1:n] = np.cumsum(self.height[:n - 1])
+        self._up_len = int(self.height[:n].sum())
+        self.up_next = np.zeros(max(self._up_len, 64), dtype=np.int64)
+        self.up_span = np.zeros(max(self._up_len, 64), dtype=np.int64)
+        links = np.arange(n)
+        for level in range(_SKIP_LEVELS if n > 0 else 0):
+            links = links[self.height[links] > level]
+            e = self.tower[links] + level
+            self.up_next[e] = np.append(links[1:], 0)
+            self.up_span[e] = np.diff(np.append(links, n))
+
+    def _new_heights(self, k: int) -> np.ndarray:
+        """Draw the number of skip levels for k new links."""
+        heights = self._rng.geometric(1 - _SKIP_P, max(k, 0)) - 1
+        return np.minimum(heights, _SKIP_LEVELS)
+
+    def _reserve(self, size: int, up_size: int) -> None:
+        """Make sure there is room for size links and up_size pointers."""
+        self.nuc = _grow(self.nuc, size)
+        self.next = _grow(self.next, size)
+        self.prev = _grow(self.prev, size)
+        self.height = _grow(self.height, size)
+        self.tower = _grow(self.tower, size)
+        self.up_next = _grow(self.up_next, up_size)
+        self.up_span = _grow(self.up_span, up_size)
 
     def _get_index(self, pos: int) -> int:
         """
         Get the index in the list-arrays that corresponds to position.
 
-        Since we use linked lists, we cannot index directly, but must
-        search though the list from the beginning.
+        We search from the top skip level and down, and the path down
+        is left in _update and _update_rank for inserting after pos.
         """
-        n = 0
-        for _ in range(pos):
-            n = self.next[n]
-        return n
+        return int(_skip_find(self.next, self.tower,
+                              self.up_next, self.up_span,
+                              pos, self._update, self._update_rank))
+
+    def _get_pos(self, i: int) -> int:
+        """Get the position of the link at index i."""
+        return int(_skip_rank(self.next, self.height, self.tower,
+                              self.up_next, self.up_span, self._len, i))
 
-    def _insert_te_at_index(self, i: int, length: int) -> int:
+    def _insert_te_at_pos(self, pos: int, length: int) -> int:
         """
         Insert a new transposable element.
 
-        Insert a new transposable element at the link at index i in
-        the arrays.
+        Insert a new transposable element before the link at position
+        pos, for 0 < pos <= len(self). Inserting before position 0 is
+        the same as inserting at the end, since the genome is circular,
+        and that way link 0 stays at position 0.
         If the TE collides with an existing TE, i.e. genome[pos]
         already contains TEs, then that TE should be disabled and
         removed from the set of active TEs.
         Returns a new ID for the transposable element.
         """
-        if self.nuc[i] in self.active:
-            del self.active[self.nuc[i]]
+        j = self._get_index(pos - 1)  # the node we should insert after
+        i = int(self.next[j])
+
+        if int(self.nuc[i]) in self.active:
+            self.disable_te(int(self.nuc[i]))
 
         # insert the TE
         te = self.next_te_id
         self.next_te_id += 1
+        if te == len(self.active_mask):
+            # Pad with False so the mask always agrees with active.
+            self.active_mask = np.concatenate(
+                (self.active_mask, np.zeros_like(self.active_mask)))
+        self.active_mask[te] = True
 
-        j = self.prev[i]  # the node we should insert after
-
-        n = len(self.nuc)
+        n = self._len
         self.active[te] = (n, length)
-        self.nuc.extend([te] * length)
-        self.next.extend([n + i + 1 for i in range(length - 1)] + [i])
-        self.prev.extend([j] + [*range(n, n + length - 1)])
+        self._active_ids.add(te)
+        heights = self._new_heights(length)
+        up_len = self._up_len + int(heights.sum())
+        self._reserve(n + length, up_len)
+        self._len = n + length
+        self.nuc[n:n + length] = te
+        self.next[n:n + length - 1] = np.arange(n + 1, n + length)
+        self.next[n + length - 1] = i
+        self.prev[n] = j
+        self.prev[n + 1:n + length] = np.arange(n, n + length - 1)
         self.next[j] = n
         self.prev[i] = n + length - 1
 
+        self.height[n:n + length] = heights
+        self.tower[n:n + length] = self._up_len + np.cumsum(heights) - heights
+        self._up_len = up_len
+        _skip_insert(self.height, self.tower, self.up_next, self.up_span,
+                     self._update, self._update_rank, n, pos, length)
+
         return te
 
     def insert_te(self, pos: int, length: int) -> int:
@@ -261,18 +581,7 @@ class LinkedListGenome(Genome):
         removed from the set of active TEs.
         Returns a new ID for the transposable element.
         """
-        i = self._get_index(pos)
-        return self._insert_te_at_index(i, length)
-
-    def _move_offset(self, i: int, offset: int) -> int:
-        """Move for index i to the link offset away (either direction)."""
-        if offset >= 0:
-            for _ in range(offset):
-                i = self.next[i]
-        else:
-            for _ in range(-offset):
-                i = self.prev[i]
-        return i
+        return self._insert_te_at_pos(pos % self._len or self._len, length)
 
     def copy_te(self, te: int, offset: int) -> int | None:
         """
@@ -288,11 +597,9 @@ class LinkedListGenome(Genome):
         """
         if te not in self.active:
             return None
-        # Find the location of the TE. It is a lot of bookkeeping
-        # to keep track of positions in a changing genome, so we
-        # explicitly search for the bugger instead.
-        pos, length = self.active[te]
-        return self._insert_te_at_index(self._move_offset(pos, offset), length)
+        i, length = self.active[te]
+        pos = _wrap(self._get_pos(i) + offset, self._len)
+        return self._insert_te_at_pos(pos or self._len, length)
 
     def disable_te(self, te: int) -> None:
         """
@@ -304,23 +611,264 @@ class LinkedListGenome(Genome):
         """
         if te in self.active:
             del self.active[te]
+            self._active_ids.discard(te)
+            self.active_mask[te] = False
 
     def active_tes(self) -> list[int]:
         """Get the active TE IDs."""
-        return list(self.active)
+        return list(self._active_ids)
+
+    def random_active(self, choice: Callable[[Sequence[int]], int]
+                      = random.choice) -> int:
+        """Pick an active TE using choice, e.g. random.choice."""
+        return choice(self._active_ids)
+
+    def active_count(self) -> int:
+        """Get the number of active TEs."""
+        return len(self.active)
+
+    @property
+    def _nucleotides(self) -> np.ndarray:
+        """Get the nucleotides in the genome in order."""
+        return self.nuc[_order(self.next, self._len)]
+
+    def __len__(self) -> int:
+        """Return length of genome."""
+        return self._len
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the genome.
+
+        Create a string that represents the genome. By nature, it will be
+        linear, but imagine that the last character is immidiatetly followed
+        by the first.
+        The genome should start at position 0. Locations with no TE should be
+        represented with the character '-', active TEs with 'A', and disabled
+        TEs with 'x'.
+        """
+        # Disabling a TE doesn't touch its nucleotides, so we work out
+        # the status of each nucleotide here, in one vectorised pass.
+        nuc = self._nucleotides
+        status = np.where(nuc == 0, _FREE,
+                          np.where(self.active_mask[nuc], _ACTIVE, _DISABLED))
+        return _STATUS_CHARS[status].tobytes().decode('ascii')
+
+
+class TreapGenome(Genome):
+    """
+    Representation of a genome.
+
+    Implements the Genome interface using an implicit-key treap, where
+    each node is an interval of nucleotides with the same TE ID (0 for no
+    TE) and status, and nodes are ordered by their position in the
+    genome. Each node knows the number of nucleotides in its subtree, so
+    we can find a position in O(log n) instead of walking from the start,
+    and memory and rendering are proportional to the number of intervals
+    rather than the number of nucleotides.
+
+    Node 0 is a sentinel for empty subtrees.
+    """
+
+    next_te_id: int                  # For assigning IDs to TEs.
+    _rng: random.Random              # For drawing heap priorities
+    root: int                        # Root node of the treap
+    te: list[int]                    # TE ID for each run
+    state: list[int]                 # Status code for each run
+    length: list[int]                # Number of nucleotides in each run
+    size: list[int]                  # Number of nucleotides in subtrees
+    prio: list[float]                # Heap priorities
+    left: list[int]                  # Left children
+    right: list[int]                 # Right children
+    parent: list[int]                # Parent pointers
+    active: dict[int, int]           # map from active IDs to their node
+    _active_ids: _ActiveList         # The keys of active, as a list
+
+    def __init__(self, n: int):
+        """Create a new genome with length n."""
+        self.next_te_id = 1
+        self._rng = random.Random(n)
+        self.te, self.state = [0], [_FREE]
+        self.length, self.size = [0], [0]
+        self.prio, self.left, self.right, self.parent = [0.0], [0], [0], [0]
+        self.root = self._new_node(0, _FREE, n) if n > 0 else 0
+        self.active = {}
+        self._active_ids = _ActiveList()
+
+    def _new_node(self, te: int, state: int, length: int) -> int:
+        """Create a single-node treap holding length nucleotides of te."""
+        self.te.append(te)
+        self.state.append(state)
+        self.length.append(length)
+        self.size.append(length)
+        self.prio.append(self._rng.random())
+        self.left.append(0)
+        self.right.append(0)
+        self.parent.append(0)
+        return len(self.te) - 1
+
+    def _update(self, t: int) -> None:
+        """Fix the size of t and the parent pointers of its children."""
+        left, right = self.left[t], self.right[t]
+        self.size[t] = self.size[left] + self.length[t] + self.size[right]
+        self.parent[left] = self.parent[right] = t
+
+    def _merge(self, a: int, b: int) -> int:
+        """Merge treaps a and b, with all of a to the left of b."""
+        if a == 0:
+            return b
+        if b == 0:
+            return a
+        if self.prio[a] > self.prio[b]:
+            self.right[a] = self._merge(self.right[a], b)
+            self._update(a)
+            return a
+        self.left[b] = self._merge(a, self.left[b])
+        self._update(b)
+        return b
+
+    def _split(self, t: int, k: int) -> tuple[int, int]:
+        """
+        Split treap t into the first k nucleotides and the rest.
+
+        If position k falls inside a run, the run is cut in two.
+        """
+        if t == 0:
+            return 0, 0
+        left_size = self.size[self.left[t]]
+        if k <= left_size:
+            a, b = self._split(self.left[t], k)
+            self.left[t] = b
+            self._update(t)
+            return a, t
+        k -= left_size
+        if k >= self.length[t]:
+            a, b = self._split(self.right[t], k - self.length[t])
+            self.right[t] = a
+            self._update(t)
+            return t, b
+        # Cut the run at k and move the tail into the right treap.
+        tail = self._new_node(self.te[t], self.state[t], self.length[t] - k)
+        self.length[t] = k
+        b = self._merge(tail, self.right[t])
+        self.right[t] = 0
+        self._update(t)
+        return t, b
+
+    def _node_at(self, pos: int) -> int:
+        """Get the node holding the nucleotide at position pos."""
+        t = self.root
+        while True:
+            left_size = self.size[self.left[t]]
+            if pos < left_size:
+                t = self.left[t]
+            elif pos < left_size + self.length[t]:
+                return t
+            else:
+                pos -= left_size + self.length[t]
+                t = self.right[t]
+
+    def _position(self, t: int) -> int:
+        """Get the position of the first nucleotide in node t."""
+        pos = self.size[self.left[t]]
+        while t != self.root:
+            p = self.parent[t]
+            if t == self.right[p]:
+                pos += self.size[self.left[p]] + self.length[p]
+            t = p
+        return pos
+
+    def insert_te(self, pos: int, length: int) -> int:
+        """
+        Insert a new transposable element.
+
+        Insert a new transposable element at position pos and len
+        nucleotide forward.
+        If the TE collides with an existing TE, i.e. genome[pos]
+        already contains TEs, then that TE should be disabled and
+        removed from the set of active TEs.
+        Returns a new ID for the transposable element.
+        """
+        # If we have collisions, destroy the existing TE that
+        # is hit.
+        if pos < len(self):
+            self.disable_te(self.te[self._node_at(pos)])
+
+        # insert the TE
+        te = self.next_te_id
+        self.next_te_id += 1
+
+        a, b = self._split(self.root, pos)
+        node = self._new_node(te, _ACTIVE, length)
+        self.root = self._merge(self._merge(a, node), b)
+        self.parent[self.root] = 0
+        self.active[te] = node
+        self._active_ids.add(te)
+
+        return te
+
+    def copy_te(self, te: int, offset: int) -> int | None:
+        """
+        Copy a transposable element.
+
+        Copy the transposable element te to an offset from its current
+        location.
+        The offset can be positive or negative; if positive the te is copied
+        upwards and if negative it is copied downwards. If the offset moves
+        the copy left of index 0 or right of the largest index, it should
+        wrap around, since the genome is circular.
+        If te is not active, return None (and do not copy it).
+        """
+        if te not in self.active:
+            return None
+        # An active TE is never split, since inserting into it would
+        # disable it, so it is always a single node.
+        node = self.active[te]
+        pos = self._position(node)
+        return self.insert_te(_wrap(pos + offset, len(self)),
+                              self.length[node])
+
+    def disable_te(self, te: int) -> None:
+        """
+        Disable a TE.
+
+        If te is an active TE, then make it inactive. Inactive
+        TEs are already inactive, so there is no need to do anything
+        for those.
+        """
+        if te in self.active:
+            self.state[self.active.pop(te)] = _DISABLED
+            self._active_ids.discard(te)
+
+    def active_tes(self) -> list[int]:
+        """Get the active TE IDs."""
+        return list(self._active_ids)
+
+    def random_active(self, choice: Callable[[Sequence[int]], int]
+                      = random.choice) -> int:
+        """Pick an active TE using choice, e.g. random.choice."""
+        return choice(self._active_ids)
+
+    def active_count(self) -> int:
+        """Get the number of active TEs."""
+        return len(self.active)
 
     @property
-    def _nucleotides(self) -> Iterable[int]:
-        """Iterate through the nucleotides in the genome."""
-        yield self.nuc[0]
-        n = self.next[0]
-        while n != 0:
-            yield self.nuc[n]
-            n = self.next[n]
+    def _runs(self) -> Iterable[tuple[int, int]]:
+        """Iterate through the (state, length) runs in the genome in order."""
+        stack, t = [], self.root
+        while stack or t != 0:
+            if t != 0:
+                stack.append(t)
+                t = self.left[t]
+            else:
+                t = stack.pop()
+                yield self.state[t], self.length[t]
+                t = self.right[t]
 
     def __len__(self) -> int:
         """Return length of genome."""
-        return len(self.nuc)
+        return self.size[self.root]
 
     def __str__(self) -> str:
         """
@@ -333,9 +881,5 @@ class LinkedListGenome(Genome):
         represented with the character '-', active TEs with 'A', and disabled
         TEs with 'x'.
         """
-        return ''.join(
-            '-' if a == 0 else
-            'A' if a in self.active else
-            'x'
-            for a in self._nucleotides
-        )
+        chars = _STATUS_CHARS.tobytes().decode('ascii')
+        return ''.join(chars[state] * length for state, length in self._runs)
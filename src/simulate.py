@@ -8,7 +8,8 @@ from typing import Type
 from genome import (
     Genome,
     ListGenome,
-    LinkedListGenome
+    LinkedListGenome,
+    TreapGenome
 )
 from dataclasses import dataclass
 
@@ -31,11 +32,6 @@ class Ops(Enum):
     COPY = 2
     DISABLE = 3
 
-    @staticmethod
-    def sample(weights: tuple[float, float, float]) -> Ops:
-        """Select which operation to do."""
-        return rand.choices(list(Ops), weights)[0]
-
 
 def sim_te(n: int, k: int,
            *,  # the remaining args below must be given by keyword
@@ -45,41 +41,69 @@ def sim_te(n: int, k: int,
     """Simulate a genome of initial size n for k operations.
 
     >>> sim_te(30, 10, seed = 1984, theta = SimParams(te_len=10))
-    '---AAAA------------x--xAAAAxxx------AAAA-xxxxAAAA------'
+    'Ax----------x-A--------x------x--A---'
     """
     rand.seed(seed)
     np.random.seed(seed if seed is not None else rand.randint(0, 10_000))
 
+    # Loop invariants
+    theta_ins, theta_cpy, theta_dis = theta.weights
+    p_len = 1 / theta.te_len        # geometric parameter for TE lengths
+    p_offset = 1 / theta.te_offset  # geometric parameter for copy offsets
+
+    # The numeric draws don't depend on the state of the simulation, so
+    # we can get all of them in one go. The choice of operation and TE
+    # depend on the active TEs and must be drawn as we go.
+    positions = np.random.random(k).tolist()
+    lengths = np.random.geometric(p_len, k).tolist()
+    offsets = np.random.geometric(p_offset, k).tolist()
+    downwards = (np.random.random(k) < 0.5).tolist()
+
     genome = genome_class(n)
-    for _ in range(k):
-        active = genome.active_tes()
-        theta_ins, theta_cpy, theta_dis = theta.weights
-        # weigh the operations with the number of active TEs
-        op_weights = (theta_ins,
-                      len(active) * theta_cpy,
-                      len(active) * theta_dis)
-        match Ops.sample(op_weights):
+    # Look up the methods we call in the loop once, up front.
+    active_count, random_active = genome.active_count, genome.random_active
+    insert_te, copy_te = genome.insert_te, genome.copy_te
+    disable_te = genome.disable_te
+    random, choice = rand.random, rand.choice
+
+    for i in range(k):
+        n_active = active_count()
+        # weigh the operations with the number of active TEs and
+        # select one by where a uniform draw falls in the cumulative
+        # weights (the same draw rand.choices would make).
+        w_ins = theta_ins
+        w_cpy = w_ins + n_active * theta_cpy
+        w_dis = w_cpy + n_active * theta_dis
+        r = random() * w_dis
+        op = (Ops.INSERT if r < w_ins else
+              Ops.COPY if r < w_cpy else
+              Ops.DISABLE)
+        match op:
             case Ops.INSERT:
-                pos = rand.randint(0, len(genome))
-                length = np.random.geometric(1/theta.te_len)
-                genome.insert_te(pos, length)
+                # uniform in 0, 1, ..., len(genome)
+                pos = int(positions[i] * (len(genome) + 1))
+                insert_te(pos, lengths[i])
 
             case Ops.COPY:
-                te = rand.choice(active)
-                offset = np.random.geometric(1/theta.te_offset)
-                if rand.random() < 0.5:
-                    offset = -offset
-                genome.copy_te(te, offset)
+                te = random_active(choice)
+                offset = -offsets[i] if downwards[i] else offsets[i]
+                copy_te(te, offset)
 
             case Ops.DISABLE:
-                te = rand.choice(active)
-                genome.disable_te(te)
+                te = random_active(choice)
+                disable_te(te)
 
     return str(genome)
 
 
 if __name__ == '__main__':
     import timeit
+
+    # The genomes' Numba kernels are compiled (or loaded from the cache)
+    # on first use, so get that out of the way before timing anything.
+    for cls in (ListGenome, LinkedListGenome, TreapGenome):
+        sim_te(100, 10, genome_class=cls)
+
     start_time = timeit.default_timer()
     sim_te(1_000_000, 1000)
     elapsed = timeit.default_timer() - start_time
@@ -89,3 +113,8 @@ if __name__ == '__main__':
     sim_te(1_000_000, 1000, genome_class=LinkedListGenome)
     elapsed = timeit.default_timer() - start_time
     print("Linked lists:", elapsed)
+
+    start_time = timeit.default_timer()
+    sim_te(1_000_000, 1000, genome_class=TreapGenome)
+    elapsed = timeit.default_timer() - start_time
+    print("Treap:", elapsed)
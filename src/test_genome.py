@@ -6,49 +6,61 @@
 # names that start with test_
 
 from genome import (
+    _ActiveList,
     Genome,
     ListGenome,
-    LinkedListGenome
+    LinkedListGenome,
+    TreapGenome
 )
 from typing import Type
+import random
 
 
 def run_genome_test(genome_class: Type[Genome]) -> None:
     """Test a Genome implementation."""
     genome = genome_class(20)
     assert str(genome) == "--------------------"
-    assert genome.active_tes() == []
+    assert sorted(genome.active_tes()) == []
+    assert genome.active_count() == 0
 
     assert 1 == genome.insert_te(5, 10)   # Insert te 1
     assert str(genome) == "-----AAAAAAAAAA---------------"
-    assert genome.active_tes() == [1]
+    assert sorted(genome.active_tes()) == [1]
 
     assert 2 == genome.insert_te(10, 10)  # Disable 1 but make 2 active
     assert str(genome) == "-----xxxxxAAAAAAAAAAxxxxx---------------"
-    assert genome.active_tes() == [2]
+    assert sorted(genome.active_tes()) == [2]
 
     # Make TE 3 20 to the right of the start of 2
     assert 3 == genome.copy_te(2, 20)
     assert str(genome) == "-----xxxxxAAAAAAAAAAxxxxx-----AAAAAAAAAA----------"
-    assert genome.active_tes() == [2, 3]
+    assert sorted(genome.active_tes()) == [2, 3]
 
     # Make TE 4 15 to the leftt of the start of 2
     assert 4 == genome.copy_te(2, -15)
     assert str(genome) \
         == "-----xxxxxAAAAAAAAAAxxxxx-----AAAAAAAAAA-----AAAAAAAAAA-----"
-    assert genome.active_tes() == [2, 3, 4]
+    assert sorted(genome.active_tes()) == [2, 3, 4]
 
     assert 5 == genome.insert_te(50, 10)
     assert str(genome) == \
         "-----xxxxxAAAAAAAAAAxxxxx-----" + \
         "AAAAAAAAAA-----xxxxxAAAAAAAAAAxxxxx-----"
-    assert genome.active_tes() == [2, 3, 5]
+    assert sorted(genome.active_tes()) == [2, 3, 5]
 
     genome.disable_te(3)
     assert str(genome) == \
         "-----xxxxxAAAAAAAAAAxxxxx-----" \
         "xxxxxxxxxx-----xxxxxAAAAAAAAAAxxxxx-----"
-    assert genome.active_tes() == [2, 5]
+    assert sorted(genome.active_tes()) == [2, 5]
+    assert genome.active_count() == 2
+    assert genome.random_active(random.Random(0).choice) in [2, 5]
+
+    # active_tes() is a snapshot, so we can disable while iterating it.
+    for te in genome.active_tes():
+        genome.disable_te(te)
+    assert genome.active_tes() == []
+    assert genome.active_count() == 0
 
 
 def test_list_genome() -> None:
@@ -59,3 +71,131 @@ def test_list_genome() -> None:
 def test_linked_list_genome() -> None:
     """Test that the linked list implementation works."""
     run_genome_test(LinkedListGenome)
+
+
+def test_treap_genome() -> None:
+    """Test that the treap implementation works."""
+    run_genome_test(TreapGenome)
+
+
+class ListModel:
+    """
+    A plain Python list model of a genome, to test the others against.
+
+    If start_at_end is set, inserting at position 0 puts the TE at the
+    end instead, which is equivalent on a circular genome and is what
+    LinkedListGenome does to keep its first link at position 0.
+    """
+
+    def __init__(self, n: int, start_at_end: bool = False):
+        """Create a model genome of length n."""
+        self.next_te_id = 1
+        self.nuc = [0] * n
+        self.active: dict[int, int] = {}
+        self.start_at_end = start_at_end
+
+    def insert_te(self, pos: int, length: int) -> int:
+        """Insert a TE at pos, disabling any TE it lands in."""
+        n = len(self.nuc)
+        hit = pos % n if self.start_at_end else pos
+        if hit < n and self.nuc[hit] in self.active:
+            del self.active[self.nuc[hit]]
+        if self.start_at_end and hit == 0:
+            pos = n
+        te = self.next_te_id
+        self.next_te_id += 1
+        self.active[te] = length
+        self.nuc[pos:pos] = [te] * length
+        return te
+
+    def copy_te(self, te: int, offset: int) -> int | None:
+        """Copy te offset positions away, if it is active."""
+        if te not in self.active:
+            return None
+        pos = self.nuc.index(te)
+        return self.insert_te((pos + offset) % len(self.nuc), self.active[te])
+
+    def disable_te(self, te: int) -> None:
+        """Disable te."""
+        self.active.pop(te, None)
+
+    def __len__(self) -> int:
+        """Return length of the genome."""
+        return len(self.nuc)
+
+    def __str__(self) -> str:
+        """Return the genome as a string of '-', 'A' and 'x'."""
+        return ''.join(
+            '-' if a == 0 else
+            'A' if a in self.active else
+            'x'
+            for a in self.nuc
+        )
+
+
+def run_random_test(genome: Genome, model: ListModel,
+                    k: int, seed: int) -> None:
+    """Run k random operations on genome and model and compare them."""
+    rng = random.Random(seed)
+    for _ in range(k):
+        active = sorted(model.active)
+        r = rng.random()
+        if r < 0.4 or not active:
+            pos = rng.randint(0, len(model))
+            length = rng.randint(1, 30)
+            assert genome.insert_te(pos, length) == \
+                model.insert_te(pos, length)
+        elif r < 0.8:
+            # Also try copying inactive TEs and offsets past the ends.
+            te = rng.randint(1, model.next_te_id - 1)
+            offset = rng.randint(-2 * len(model), 2 * len(model))
+            assert genome.copy_te(te, offset) == model.copy_te(te, offset)
+        else:
+            te = rng.choice(active)
+            genome.disable_te(te)
+            model.disable_te(te)
+        assert len(genome) == len(model)
+        assert sorted(genome.active_tes()) == sorted(model.active)
+        assert str(genome) == str(model)
+
+
+def test_linked_list_genome_random() -> None:
+    """Test the linked list's skip levels on a larger genome."""
+    genome = LinkedListGenome(5000)
+    run_random_test(genome, ListModel(5000, start_at_end=True), 300, 1)
+
+    # Going from links to positions and back should be the identity.
+    for i in random.Random(2).sample(range(len(genome)), 500):
+        assert genome._get_index(genome._get_pos(i)) == i
+    assert [genome._get_pos(genome._get_index(pos))
+            for pos in range(len(genome))] == list(range(len(genome)))
+
+
+def test_list_genome_random() -> None:
+    """Test the list's gap buffer, with the gap moving both ways."""
+    # Start smaller than the initial capacity, so the buffer must grow.
+    genome = ListGenome(10)
+    run_random_test(genome, ListModel(10), 300, 3)
+    assert len(genome.nuc) > 64
+
+    genome = ListGenome(5000)
+    run_random_test(genome, ListModel(5000), 300, 4)
+
+
+def test_active_list() -> None:
+    """Test removing IDs from the middle of an active list."""
+    rng = random.Random(5)
+    ids, model = _ActiveList(), []
+    for te in range(1, 200):
+        ids.add(te)
+        model.append(te)
+        if rng.random() < 0.5:
+            gone = rng.choice(model)
+            ids.discard(gone)
+            model.remove(gone)
+        assert sorted(ids) == model
+    # Every remaining ID must still be removable from wherever it is.
+    for te in rng.sample(model, len(model)):
+        ids.discard(te)
+        model.remove(te)
+        assert sorted(ids) == model